@@ -1,230 +1,389 @@
 import streamlit as st
 import fitz  # PyMuPDF
+import bisect
+import functools
+import hashlib
+import os
 import re
+import numpy as np
 import pandas as pd
 from io import BytesIO
-
-st.set_page_config(page_title="Horizon Topic Extractor", layout="centered")
-st.title("📄 Horizon Topic Extractor")
-st.write("Upload a Horizon Europe PDF file and get an Excel sheet with parsed topics.")
-
-# ========== File Upload ==========
-uploaded_file = st.file_uploader("Upload a Horizon PDF", type=["pdf"])
+from pathlib import Path
+
+# ========== Patterns ==========
+_NORMALIZE_TABLE = str.maketrans({"\r": "\n", "\xa0": " "})
+_RE_WS = re.compile(r"[ \t]+")
+_RE_MULTI_NL = re.compile(r"\s*\n\s*")
+_RE_HORIZON_ID = re.compile(r"^HORIZON-[A-Z0-9\-]+:?$")
+_RE_TOPIC = re.compile(r"^(HORIZON-[A-Za-z0-9\-]+):\s*(.*)$")
+_RE_TOPIC_HEADER = re.compile(r"^(HORIZON-[A-Za-z0-9\-]+):[ \t]*(.*)$", re.MULTILINE)
+_RE_BUDGET_AROUND = re.compile(r"around\s+eur\s+([\d.,]+)", re.IGNORECASE)
+_RE_BUDGET_BETWEEN = re.compile(r"between\s+eur\s+[\d.,]+\s+and\s+([\d.,]+)", re.IGNORECASE)
+_RE_TOTAL = re.compile(r"indicative budget.*?eur\s?([\d.,]+)", re.IGNORECASE)
+# EUR million amounts, tried in order: "1,500.00" / "2.01" / ".5", dotted thousands
+# "1.500.000" / "1.500,50", then a decimal comma "2,5" (a lone ",000" group is thousands)
+_RE_EUR_AMOUNT = re.compile(
+    r"(?P<whole>\d{1,3}(?:,\d{3})+|\d*)(?:\.(?P<fraction>\d+))?"
+    r"|(?P<dotted_whole>\d{1,3}(?:\.\d{3})+)(?:,(?P<dotted_fraction>\d+))?"
+    r"|(?P<comma_whole>\d+),(?P<comma_fraction>\d{1,2}|\d{4,})"
+)
+_RE_TRL = re.compile(r"TRL\s*(\d+)[^\d]*(\d+)?", re.IGNORECASE)
+_RE_CALL_LINE = re.compile(r"^\s*Call[:\-]", re.IGNORECASE)
+_RE_CONFIRM = re.compile(r"call:|type of action", re.IGNORECASE)
+_RE_TOA = re.compile(r"type of action", re.IGNORECASE)
+_RE_THIS_DEST = re.compile(r"^this destination", re.IGNORECASE | re.MULTILINE)
+_RE_DATE = re.compile(r"(\d{1,2} \w+ \d{4})")
+# One alternative per metadata line kind, dispatched on the matched group name
+_RE_META = re.compile(
+    r"^(?:(?P<opening>(?i:opening:).*)"
+    r"|(?P<deadline>(?i:deadline).*)"
+    r"|(?P<destination>(?i:destination).*)"
+    r"|(?P<topic>HORIZON-[A-Z0-9\-]+):.*"
+    # Lowercase codes are topics too, but never carried date metadata
+    r"|(?P<lowercase_topic>HORIZON-[A-Za-z0-9\-]+):.*"
+    r"|(?P<this_destination>(?i:this destination).*)"
+    r"|(?i:call):[ \t]*(?P<call>.*))$",
+    re.MULTILINE
+)
+_RE_NEXT_LINE = re.compile(r"\s*(.+)")
+_RE_BLOCK_END = re.compile(r"HORIZON-[A-Za-z0-9\-]+:|(?i:this destination)")
 
 # ========== PDF Parsing ==========
-def extract_text_from_pdf(file):
-    with fitz.open(stream=file.read(), filetype="pdf") as doc:
-        return "\n".join(page.get_text() for page in doc)
+def extract_text_from_pdf(pdf_bytes):
+    parts = []
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        for page in doc:
+            parts.append(page.get_text())
+            parts.append("\n")
+    return "".join(parts)
 
 # ========== Utility ==========
 def normalize_text(text):
-    text = text.replace('\r\n', '\n').replace('\r', '\n')
-    text = re.sub(r"\xa0", " ", text)
-    text = re.sub(r"[ \t]+", " ", text)
-    text = re.sub(r"\n+", "\n", text)
+    # "\r\n" becomes "\n\n" here and is collapsed with the other line breaks below
+    text = text.translate(_NORMALIZE_TABLE)
+    text = _RE_WS.sub(" ", text)
+    text = _RE_MULTI_NL.sub("\n", text)
     return text.strip()
 
+def _parse_eur_millions(amount):
+    # Trailing separators are sentence punctuation; a leading one is a decimal point (".5")
+    match = _RE_EUR_AMOUNT.fullmatch(amount.rstrip(".,"))
+    if not match:
+        # Separators that fit no single convention, e.g. "2.5.0" or "1,5,0"
+        return None
+    whole = match["whole"] or match["dotted_whole"] or match["comma_whole"] or ""
+    fraction = match["fraction"] or match["dotted_fraction"] or match["comma_fraction"] or ""
+    if not whole and not fraction:
+        return None
+    whole = whole.replace(",", "").replace(".", "")
+    return int(whole or 0) * 1_000_000 + int((fraction + "000000")[:6])
+
+# ========== Text Cache ==========
+# Opt-in: set HORIZON_EXTRACTOR_CACHE_DIR to keep extracted text across restarts
+CACHE_DIR = Path(os.environ["HORIZON_EXTRACTOR_CACHE_DIR"]) if os.environ.get("HORIZON_EXTRACTOR_CACHE_DIR") else None
+# Bump whenever extract_text_from_pdf or normalize_text output changes
+_TEXT_CACHE_VERSION = 2
+# Oldest entries are evicted beyond this many cached documents
+_TEXT_CACHE_MAX_FILES = 32
+# Matches only entries this cache wrote (any version), never other files in CACHE_DIR
+_TEXT_CACHE_GLOB = "[0-9a-f]" * 32 + ".v*.txt"
+
+def load_normalized_text(pdf_bytes):
+    if CACHE_DIR is None:
+        return normalize_text(extract_text_from_pdf(pdf_bytes))
+
+    key = hashlib.blake2b(pdf_bytes, digest_size=16).hexdigest()
+    cache_path = CACHE_DIR / f"{key}.v{_TEXT_CACHE_VERSION}.txt"
+    # The cache is best-effort: an unreadable or corrupt entry is re-extracted,
+    # and a read-only cache directory must not break parsing.
+    try:
+        return cache_path.read_text(encoding="utf-8")
+    except (OSError, UnicodeDecodeError):
+        pass
+
+    text = normalize_text(extract_text_from_pdf(pdf_bytes))
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(".tmp")
+        tmp_path.write_text(text, encoding="utf-8")
+        os.replace(tmp_path, cache_path)
+        entries = sorted(CACHE_DIR.glob(_TEXT_CACHE_GLOB), key=lambda path: path.stat().st_mtime)
+        for stale_path in entries[:-_TEXT_CACHE_MAX_FILES]:
+            stale_path.unlink(missing_ok=True)
+    except OSError:
+        pass
+    return text
+
 # ========== Topic Extraction ==========
 def extract_topic_blocks(text):
-    lines = [l.strip() for l in text.splitlines() if l.strip()]
+    # normalize_text leaves no blank lines and no whitespace around line breaks
+    lines = text.split("\n")
     fixed_lines = []
     i = 0
     while i < len(lines):
-        if re.match(r"^HORIZON-[A-Z0-9\-]+:?$", lines[i]) and i + 1 < len(lines):
+        if _RE_HORIZON_ID.match(lines[i]) and i + 1 < len(lines):
             fixed_lines.append(f"{lines[i]} {lines[i + 1]}")
             i += 2
         else:
             fixed_lines.append(lines[i])
             i += 1
 
-    topic_pattern = r"^(HORIZON-[A-Za-z0-9\-]+):\s*(.*)$"
+    joined = "\n".join(fixed_lines)
+    line_starts = []
+    offset = 0
+    for line in fixed_lines:
+        line_starts.append(offset)
+        offset += len(line) + 1
+    n_lines = len(fixed_lines)
+
+    # A header only counts as a topic if "call:" or "type of action" follows within 19 lines
     candidate_topics = []
-    for i, line in enumerate(fixed_lines):
-        match = re.match(topic_pattern, line)
-        if match:
-            lookahead_text = "\n".join(fixed_lines[i+1:i+20]).lower()
-            if any(key in lookahead_text for key in ["call:", "type of action"]):
-                candidate_topics.append({
-                    "code": match.group(1),
-                    "title": match.group(2).strip(),
-                    "start_line": i
-                })
+    for match in _RE_TOPIC_HEADER.finditer(joined):
+        i = bisect.bisect_left(line_starts, match.start())
+        if i + 1 >= n_lines:
+            continue
+        window_end = line_starts[i + 20] - 1 if i + 20 < n_lines else len(joined)
+        if _RE_CONFIRM.search(joined, line_starts[i + 1], window_end):
+            candidate_topics.append({
+                "code": match.group(1),
+                "title": match.group(2).strip(),
+                "start": match.start()
+            })
+
+    destination_starts = [m.start() for m in _RE_THIS_DEST.finditer(joined)]
 
     topic_blocks = []
     for idx, topic in enumerate(candidate_topics):
-        start = topic["start_line"]
-        end = candidate_topics[idx + 1]["start_line"] if idx + 1 < len(candidate_topics) else len(fixed_lines)
-        for j in range(start + 1, end):
-            if fixed_lines[j].lower().startswith("this destination"):
-                end = j
-                break
+        start = topic["start"]
+        end = candidate_topics[idx + 1]["start"] if idx + 1 < len(candidate_topics) else len(joined)
+        pos = bisect.bisect_right(destination_starts, start)
+        if pos < len(destination_starts) and destination_starts[pos] < end:
+            end = destination_starts[pos]
         topic_blocks.append({
             "code": topic["code"],
             "title": topic["title"],
-            "full_text": "\n".join(fixed_lines[start:end]).strip()
+            "full_text": joined[start:end].strip()
         })
 
     return topic_blocks
 
 # ========== Field Extraction ==========
-def extract_data_fields(topic):
-    text = normalize_text(topic["full_text"])
+# Output column -> (keyword that opens the section, line prefixes that close it)
+_SECTIONS = {
+    "Expected Outcome": ("expected outcome:", ("scope:", "objective:", "expected impact:", "eligibility:", "budget")),
+    "Scope": ("scope:", ("objective:", "expected outcome:", "expected impact:", "budget")),
+}
+
+def segment_topic(lines, lower_lines):
+    sections = {}
+    open_sections = {}
+    pending = dict(_SECTIONS)
+    for line, l in zip(lines, lower_lines):
+        for name in list(open_sections):
+            if l.startswith(_SECTIONS[name][1]):
+                del open_sections[name]
+            else:
+                open_sections[name].append(line)
+        for name, (keyword, _) in list(pending.items()):
+            if keyword in l:
+                del pending[name]
+                open_sections[name] = sections[name] = [line.split(":", 1)[-1].strip()]
+        if not open_sections and not pending:
+            break
+    return {name: "\n".join(section).strip() for name, section in sections.items()}
+
+# Only pays off when an updated version of a document repeats topics verbatim, so hold
+# roughly one Work Programme's worth of topic texts rather than pinning every upload.
+# Results are shared between callers, so treat the returned dict as read-only
+@functools.lru_cache(maxsize=256)
+def extract_text_fields(text):
+    lines = text.splitlines()
+    lower_lines = text.lower().splitlines()
 
     def extract_budget(text):
-        match = re.search(r"around\s+eur\s+([\d.,]+)", text.lower())
-        if match:
-            return int(float(match.group(1).replace(",", "")) * 1_000_000)
-        match = re.search(r"between\s+eur\s+[\d.,]+\s+and\s+([\d.,]+)", text.lower())
-        if match:
-            return int(float(match.group(1).replace(",", "")) * 1_000_000)
-        return None
+        match = _RE_BUDGET_AROUND.search(text) or _RE_BUDGET_BETWEEN.search(text)
+        return _parse_eur_millions(match.group(1)) if match else None
 
     def extract_total_budget(text):
-        match = re.search(r"indicative budget.*?eur\s?([\d.,]+)", text.lower())
-        return int(float(match.group(1).replace(",", "")) * 1_000_000) if match else None
+        match = _RE_TOTAL.search(text)
+        return _parse_eur_millions(match.group(1)) if match else None
 
-    def get_section(keyword, stop_keywords):
-        lines = text.splitlines()
-        collecting = False
-        section = []
-        for line in lines:
-            l = line.lower()
-            if not collecting and keyword in l:
-                collecting = True
-                section.append(line.split(":", 1)[-1].strip())
-            elif collecting and any(l.startswith(k) for k in stop_keywords):
-                break
-            elif collecting:
-                section.append(line)
-        return "\n".join(section).strip() if section else None
-
-    def extract_type_of_action(text):
-        lines = text.splitlines()
+    def extract_type_of_action(lines):
         for i, line in enumerate(lines):
-            if "type of action" in line.lower():
+            if _RE_TOA.search(line):
                 for j in range(i + 1, len(lines)):
                     if lines[j].strip():
                         return lines[j].strip()
         return None
 
-    def extract_topic_title(text):
-        lines = text.strip().splitlines()
+    def extract_topic_title(lines):
         title_lines = []
         found = False
         for line in lines:
             if not found:
-                match = re.match(r"^(HORIZON-[A-Za-z0-9-]+):\s*(.*)", line)
+                match = _RE_TOPIC.match(line)
                 if match:
                     found = True
                     title_lines.append(match.group(2).strip())
             else:
-                if re.match(r"^\s*Call[:\-]", line, re.IGNORECASE):
+                if _RE_CALL_LINE.match(line):
                     break
                 elif line.strip():
                     title_lines.append(line.strip())
         return " ".join(title_lines) if title_lines else None
 
-    def extract_call_name_topic(text):
-        text = normalize_text(text)
-        match = re.search(r"(?i)^\s*Call:\s*(.+)$", text, re.MULTILINE)
-        if match:
-            return match.group(1).strip()
-        return None
+    sections = segment_topic(lines, lower_lines)
 
     return {
-        "title": extract_topic_title(text),
-        "budget_per_project": extract_budget(text),
-        "indicative_total_budget": extract_total_budget(text),
-        "type_of_action": extract_type_of_action(text),
-        "expected_outcome": get_section("expected outcome:", ["scope:", "objective:", "expected impact:", "eligibility:", "budget"]),
-        "scope": get_section("scope:", ["objective:", "expected outcome:", "expected impact:", "budget"]),
-        "call": extract_call_name_topic(text),
-        "trl": (m := re.search(r"TRL\s*(\d+)[^\d]*(\d+)?", text, re.IGNORECASE)) and (
+        "Title": extract_topic_title(lines),
+        "Budget Per Project": extract_budget(text),
+        "Total Budget": extract_total_budget(text),
+        "Type of Action": extract_type_of_action(lines),
+        "TRL": (m := _RE_TRL.search(text)) and (
             f"{m.group(1)}-{m.group(2)}" if m.group(2) else m.group(1)
-        )
+        ),
+        "Expected Outcome": sections.get("Expected Outcome"),
+        "Scope": sections.get("Scope")
     }
 
+def extract_data_fields(topic, metadata):
+    return {
+        "Code": topic["code"],
+        **extract_text_fields(topic["full_text"]),
+        "Opening Date": metadata.get("opening_date"),
+        "Deadline": metadata.get("deadline"),
+        "Destination": metadata.get("destination"),
+        "Call Name": metadata.get("call_name"),
+        "Description": topic["full_text"]
+    }
+
+def extract_all_data_fields(topic_blocks, metadata_by_code):
+    return [extract_data_fields(topic, metadata_by_code.get(topic["code"], {})) for topic in topic_blocks]
+
 def extract_metadata_blocks(text):
-    lines = normalize_text(text).splitlines()
+    def first_date(line):
+        match = _RE_DATE.search(line)
+        return match.group(1) if match else None
 
     metadata_map = {}
+    call_names = {}
     current_metadata = {
         "opening_date": None,
         "deadline": None,
         "destination": None
     }
 
-    topic_pattern = re.compile(r"^(HORIZON-[A-Z0-9\-]+):")
-
+    current_code = None
     collecting = False
-    for i, line in enumerate(lines):
-        lower = line.lower()
-
-        if lower.startswith("opening:"):
-            current_metadata["opening_date"] = re.search(r"(\d{1,2} \w+ \d{4})", line)
-            current_metadata["opening_date"] = (
-                current_metadata["opening_date"].group(1)
-                if current_metadata["opening_date"]
-                else None
-            )
+    for match in _RE_META.finditer(text):
+        kind = match.lastgroup
+
+        if kind == "opening":
+            current_metadata["opening_date"] = first_date(match.group("opening"))
             current_metadata["deadline"] = None
             collecting = True
 
-        elif collecting and lower.startswith("deadline"):
-            current_metadata["deadline"] = re.search(r"(\d{1,2} \w+ \d{4})", line)
-            current_metadata["deadline"] = (
-                current_metadata["deadline"].group(1)
-                if current_metadata["deadline"]
-                else None
-            )
+        elif collecting and kind == "deadline":
+            current_metadata["deadline"] = first_date(match.group("deadline"))
+
+        elif collecting and kind == "destination":
+            current_metadata["destination"] = match.group("destination").split(":", 1)[-1].strip()
+
+        elif kind == "topic":
+            current_code = match.group("topic")
+            if collecting:
+                metadata_map[current_code] = current_metadata.copy()
 
-        elif collecting and lower.startswith("destination"):
-            current_metadata["destination"] = line.split(":", 1)[-1].strip()
+        elif kind == "lowercase_topic":
+            current_code = match.group("lowercase_topic")
 
-        elif collecting:
-            match = topic_pattern.match(line)
-            if match:
-                code = match.group(1)
-                metadata_map[code] = current_metadata.copy()
+        elif kind == "this_destination":
+            # Topic blocks end here, so later "Call:" lines belong to no topic
+            current_code = None
+
+        elif kind == "call" and current_code and current_code not in call_names:
+            # The first "Call:" line after a topic header names that topic's call;
+            # a bare "Call:" puts the name on the following line
+            call_name = match.group("call").strip()
+            if not call_name and (next_line := _RE_NEXT_LINE.match(text, match.end())):
+                if not _RE_BLOCK_END.match(next_line.group(1)):
+                    call_name = next_line.group(1).strip()
+            if call_name:
+                call_names[current_code] = call_name
+
+    for code, call_name in call_names.items():
+        metadata_map.setdefault(code, {})["call_name"] = call_name
 
     return metadata_map
 
+# ========== Output ==========
+COLUMNS = [
+    "Code", "Title", "Opening Date", "Deadline", "Destination",
+    "Budget Per Project", "Total Budget", "Number of Projects",
+    "Type of Action", "TRL", "Call Name", "Expected Outcome", "Scope",
+    "Description"
+]
+_INT_COLUMNS = ("Budget Per Project", "Total Budget")
+
+def build_dataframe(rows):
+    data = {column: [row[column] for row in rows] for column in COLUMNS if column != "Number of Projects"}
+    for column in _INT_COLUMNS:
+        data[column] = pd.array(data[column], dtype="Int64")
+
+    budget = data["Budget Per Project"].to_numpy(dtype=np.int64, na_value=0)
+    total_budget = data["Total Budget"].to_numpy(dtype=np.int64, na_value=0)
+    valid = (budget > 0) & (total_budget > 0)
+    projects = np.floor_divide(total_budget, np.where(valid, budget, 1))
+    data["Number of Projects"] = pd.arrays.IntegerArray(projects, ~valid)
+
+    return pd.DataFrame(data, columns=COLUMNS)
+
+def build_search_index(df):
+    # One lowercased string per topic; the unit separator keeps matches from spanning cells
+    haystack = df[COLUMNS[0]].astype(str).fillna("")
+    for column in COLUMNS[1:]:
+        haystack = haystack + "\x1f" + df[column].astype(str).fillna("")
+    return haystack.str.lower()
+
+def build_excel(df):
+    output = BytesIO()
+    # constant_memory is not usable here: pandas writes cells column by column and
+    # xlsxwriter drops writes to rows it has already flushed in that mode
+    excel_options = {"strings_to_urls": False}
+    with pd.ExcelWriter(output, engine="xlsxwriter", engine_kwargs={"options": excel_options}) as writer:
+        df.to_excel(writer, index=False, sheet_name="Topics")
+    return output.getvalue()
+
+# ========== Pipeline ==========
+# Each entry holds a document's table, search index and workbook bytes; bound them
+# so a long-running multi-user server does not keep every upload in memory
+_PARSE_CACHE_MAX_ENTRIES = 16
+_PARSE_CACHE_TTL = "1h"
+
+@st.cache_data(show_spinner="Parsing PDF...", max_entries=_PARSE_CACHE_MAX_ENTRIES, ttl=_PARSE_CACHE_TTL)
+def parse_pdf(pdf_bytes):
+    text = load_normalized_text(pdf_bytes)
+    topic_blocks = extract_topic_blocks(text)
+    metadata_by_code = extract_metadata_blocks(text)
+    df = build_dataframe(extract_all_data_fields(topic_blocks, metadata_by_code))
+    # Description is only needed for search and export, so the table the UI keeps
+    # across reruns leaves the long text out
+    return df.drop(columns=["Description"]), build_search_index(df), build_excel(df)
+
 # ========== Main Streamlit App ==========
-if uploaded_file:
-    raw_text = extract_text_from_pdf(uploaded_file)
-
-    topic_blocks = extract_topic_blocks(raw_text)
-    metadata_by_code = extract_metadata_blocks(raw_text)
-
-    enriched = [
-        {
-            **topic,
-            **extract_data_fields(topic),
-            **metadata_by_code.get(topic["code"], {})
-        }
-        for topic in topic_blocks
-    ]
-
-    df = pd.DataFrame([{
-        "Code": t["code"],
-        "Title": t["title"],
-        "Opening Date": t.get("opening_date"),
-        "Deadline": t.get("deadline"),
-        "Destination": t.get("destination"),
-        "Budget Per Project": t.get("budget_per_project"),
-        "Total Budget": t.get("indicative_total_budget"),
-        "Number of Projects": int(t["indicative_total_budget"] / t["budget_per_project"])
-            if t.get("budget_per_project") and t.get("indicative_total_budget") else None,
-        "Type of Action": t.get("type_of_action"),
-        "TRL": t.get("trl"),
-        "Call Name": t.get("call"),
-        "Expected Outcome": t.get("expected_outcome"),
-        "Scope": t.get("scope"),
-        "Description": t.get("full_text")
-    } for t in enriched])
+def main():
+    st.set_page_config(page_title="Horizon Topic Extractor", layout="centered")
+    st.title("📄 Horizon Topic Extractor")
+    st.write("Upload a Horizon Europe PDF file and get an Excel sheet with parsed topics.")
+
+    uploaded_file = st.file_uploader("Upload a Horizon PDF", type=["pdf"])
+    if not uploaded_file:
+        return
+
+    df, search_index, excel_bytes = parse_pdf(uploaded_file.getvalue())
 
     st.subheader("📊 Preview of Extracted Topics")
-    st.dataframe(df.drop(columns=["Description"]).head(10), use_container_width=True)
+    st.dataframe(df.head(10), use_container_width=True)
 
     # ========== 🔍 New Word Search ==========
     st.subheader("🔍 Search Topics by Keyword")
@@ -232,22 +391,21 @@ if uploaded_file:
 
     if keyword:
         keyword = keyword.lower()
-        filtered_df = df[df.apply(lambda row: row.astype(str).str.lower().str.contains(keyword).any(), axis=1)]
-        filtered_df = filtered_df.drop_duplicates()
+        filtered_df = df[search_index.str.contains(keyword, regex=False)]
+        filtered_df = filtered_df.drop_duplicates(subset=["Code"])
 
         st.markdown(f"**Results containing keyword: `{keyword}`**")
-        st.dataframe(filtered_df.drop(columns=["Description"]), use_container_width=True)
+        st.dataframe(filtered_df, use_container_width=True)
         st.write(f"🔎 Found {len(filtered_df)} matching topics.")
 
     # ========== Download ==========
-    output = BytesIO()
-    df.to_excel(output, index=False)
-    output.seek(0)
-
     st.success(f"✅ Extracted {len(df)} topics!")
     st.download_button(
         label="⬇️ Download Excel File",
-        data=output,
+        data=excel_bytes,
         file_name="horizon_topics.xlsx",
         mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
     )
+
+if __name__ == "__main__":
+    main()